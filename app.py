@@ -4,16 +4,31 @@ Blue Frog — Spotify Analytics Dashboard
 Streamlit + DuckDB | Run: streamlit run app.py
 """
 
+import csv
+import hashlib
 import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import unicodedata
+import zipfile
+from array import array
+from pathlib import Path
 import duckdb
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.offline import get_plotlyjs
 from plotly.subplots import make_subplots
 import streamlit as st
 
+ARTIST = "Blue Frog"
+
 st.set_page_config(
-    page_title="Blue Frog · Spotify Analytics",
+    page_title=f"{ARTIST} · Spotify Analytics",
     page_icon="🐸",
     layout="wide",
     initial_sidebar_state="collapsed",
@@ -342,15 +357,202 @@ textarea:focus {{ border-color: {TERRACOTTA} !important; outline: none !importan
 # ═══════════════════════════════════════════════════════════════════════════════
 # HELPERS
 # ═══════════════════════════════════════════════════════════════════════════════
+# Column contract for each Spotify export. Uploads are parsed in chunks of
+# INGEST_CHUNK_ROWS rows, cast to these types, and rows that fail are set aside
+# with a reason instead of being silently zeroed.
+EXPORT_SCHEMAS = {
+    "timeline": {"date": "date", "listeners": "int", "streams": "int", "followers": "int"},
+    "songs":    {"song": "text", "listeners": "int", "streams": "int", "saves": "int", "release_date": "date"},
+}
+EXPORT_KEYS       = {"timeline": "date", "songs": "song"}
+INGEST_CHUNK_ROWS = 50_000
+MAX_REJECTS_KEPT  = 1_000
+
+def iter_exports(upload):
+    """Yield (name, stream) for an uploaded CSV, or for every CSV inside an uploaded zip."""
+    upload.seek(0)
+    if not upload.name.lower().endswith(".zip"):
+        yield upload.name, upload
+        return
+    with zipfile.ZipFile(upload) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.lower().endswith(".csv") or "__MACOSX" in info.filename:
+                continue
+            with archive.open(info) as member:
+                yield f"{upload.name}/{info.filename}", member
+
+def detect_export(columns, expected):
+    for kind in [expected, *(k for k in EXPORT_SCHEMAS if k != expected)]:
+        if set(EXPORT_SCHEMAS[kind]) <= set(columns):
+            return kind, []
+    return None, [c for c in EXPORT_SCHEMAS[expected] if c not in set(columns)]
+
+def coerce_chunk(chunk, schema):
+    """Cast one chunk to its schema; return (valid rows, rejected raw rows with a reason)."""
+    out    = pd.DataFrame(index=chunk.index)
+    reason = pd.Series("", index=chunk.index)
+    for col, kind in schema.items():
+        raw   = chunk[col].str.strip()
+        blank = raw.eq("")
+        if kind == "int":
+            # Counts are whole and non-negative: blanks, "1.7", "1e3" and "-5" are rejected, not zeroed or rounded.
+            digits = raw.str.replace(",", "", regex=False)
+            bad = ~digits.str.fullmatch(r"\d{1,18}")
+            out[col] = digits.mask(bad, "0").astype("int64")
+        elif kind == "date":
+            out[col] = pd.to_datetime(raw, errors="coerce")
+            bad = out[col].isna()
+        else:
+            out[col] = raw
+            bad = blank
+        reason = reason.mask(bad & blank & reason.eq(""), f"missing {col}")
+        reason = reason.mask(bad & reason.eq(""), f"invalid {col}")
+    ok = reason.eq("")
+    valid = out[ok].astype({c: "int64" for c, k in schema.items() if k == "int"})
+    return valid, chunk[~ok].assign(reason=reason[~ok])
+
 @st.cache_data(show_spinner=False)
-def load_csv(file_bytes: bytes) -> pd.DataFrame:
-    df = pd.read_csv(io.BytesIO(file_bytes))
-    df.columns = df.columns.str.strip().str.lstrip("\ufeff")
-    return df
+def ingest_upload(file_id, _upload, expected, chunk_rows=INGEST_CHUNK_ROWS) -> dict:
+    """Stream one upload (CSV or zip of CSVs) through the export contracts.
+
+    Each CSV is walked once by scan_csv() to set aside rows of the wrong width
+    and note line numbers, then read by pandas' C parser `chunk_rows` rows at a
+    time as text and cast per chunk, so parsing memory is bounded by the chunk
+    size. Each CSV is routed by its header, so a zip may mix timeline and songs
+    exports. `file_id` is the cache key.
+    """
+    result = {kind: [] for kind in EXPORT_SCHEMAS}
+    result.update(rejected=[], rejected_count=0, errors=[])
+    try:
+        for name, stream in iter_exports(_upload):
+            try:
+                ingest_csv(name, stream, expected, chunk_rows, result)
+            except (csv.Error, pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError,
+                    zipfile.BadZipFile) as e:
+                result["errors"].append(f"{name}: {e}")
+    except zipfile.BadZipFile as e:
+        result["errors"].append(f"{_upload.name}: {e}")
+    return result
+
+def scan_csv(stream):
+    """Walk a CSV once with the csv module and map out its records.
+
+    Returns (header, starts, skip, misfits, bad_count). `starts` holds the
+    physical line on which every well-formed record begins. `skip` holds the
+    record numbers of rows whose field count doesn't match the header, and
+    `misfits` keeps the first MAX_REJECTS_KEPT of those as (line, fields). A
+    single trailing empty field, on the header or any row, counts as well-formed.
+    Blank lines are ignored.
+    """
+    text   = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = next(reader, [])
+    if header and header[-1] == "":
+        header.pop()  # a trailing comma on the header too; the column must stay empty
+    width  = len(header)
+    starts, skip, misfits = array("q"), [], []
+    line = reader.line_num + 1
+    for record, fields in enumerate(reader, start=1):
+        if len(fields) == width or (len(fields) == width + 1 and fields[-1] == ""):
+            starts.append(line)
+        elif fields:
+            skip.append(record)
+            if len(misfits) < MAX_REJECTS_KEPT:
+                misfits.append((line, fields))
+        line = reader.line_num + 1
+    text.detach()
+    stream.seek(0)
+    return header, starts, skip, misfits, len(skip)
+
+def ingest_csv(name, stream, expected, chunk_rows, result):
+    """Parse one CSV stream into `result`, routing it by header and keeping rejects."""
+    header, starts, skip, misfits, bad_count = scan_csv(stream)
+    names = [h.strip().lstrip("\ufeff") for h in header]
+    names = [h if names.index(h) == i else f"{h}.{i}" for i, h in enumerate(names)]
+    kind, missing = detect_export(names, expected)
+    if kind is None:
+        result["errors"].append(f"{name}: missing column(s) {', '.join(missing)}" if names else f"{name}: empty file")
+        return
+    if not starts and not bad_count:
+        result["errors"].append(f"{name}: no data rows")
+        return
+
+    cols, width = list(EXPORT_SCHEMAS[kind]), len(names)
+    result["rejected_count"] += bad_count
+    misfits = misfits[:MAX_REJECTS_KEPT - sum(len(r) for r in result["rejected"])]
+    if misfits:
+        rows = pd.DataFrame([(f + [""] * width)[:width] for _, f in misfits], columns=names,
+                            index=[l for l, _ in misfits])
+        rows = rows[cols].assign(reason=[f"expected {width} fields, saw {len(f)}" for _, f in misfits])
+        result["rejected"].append(rows.assign(file=name, line=rows.index))
+
+    # The scan already set aside rows of the wrong width, so the C parser only sees
+    # rows that fit the header (plus, at most, an empty trailing field it drops).
+    reader = pd.read_csv(stream, chunksize=chunk_rows, dtype=str, keep_default_na=False, encoding="utf-8-sig",
+                         usecols=range(width), index_col=False, skiprows=skip or None)
+    lines, seen = np.frombuffer(starts, dtype=np.int64), 0
+    for chunk in reader:
+        chunk.columns = names
+        chunk.index = lines[seen:seen + len(chunk)]
+        seen += len(chunk)
+        valid, bad = coerce_chunk(chunk[cols], EXPORT_SCHEMAS[kind])
+        result[kind].append(valid.reset_index(drop=True))
+        result["rejected_count"] += len(bad)
+        room = MAX_REJECTS_KEPT - sum(len(r) for r in result["rejected"])
+        if len(bad) and room > 0:
+            result["rejected"].append(bad.head(room).assign(file=name, line=bad.index[:room]))
+
+def merge_exports(results, kind) -> pd.DataFrame:
+    """Concatenate one export kind across uploads; later files win on duplicate keys."""
+    frames = [f for r in results for f in r[kind]]
+    if not frames:
+        return pd.DataFrame({c: pd.Series(dtype="datetime64[ns]" if t == "date" else "int64" if t == "int" else object)
+                             for c, t in EXPORT_SCHEMAS[kind].items()})
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.drop_duplicates(EXPORT_KEYS[kind], keep="last").reset_index(drop=True)
 
 def register_tables(con, timeline, songs):
     con.register("timeline", timeline)
     con.register("songs", songs)
+    # Versions share listeners, so a work's listeners is its largest version's count, not a sum.
+    con.execute("""
+        CREATE VIEW song_works AS
+        SELECT work_id, work AS song, COUNT(*) AS versions, MAX(listeners) AS listeners,
+               SUM(streams)::BIGINT AS streams, SUM(saves)::BIGINT AS saves, MIN(release_date) AS release_date
+        FROM songs GROUP BY work_id, work
+    """)
+
+# Song tables shown in tab 2: grouping -> (DuckDB relation, columns shown).
+SONG_TABLES = {
+    "Track": ("songs",      ["song", "listeners", "streams", "saves", "release_date", "work"]),
+    "Work":  ("song_works", ["song", "versions", "listeners", "streams", "saves", "release_date"]),
+}
+
+def song_filter(search):
+    return ("WHERE contains(lower(song), lower(?))", [search]) if search else ("", [])
+
+def count_rows(con, view, search=""):
+    where, params = song_filter(search)
+    return con.execute(f"SELECT COUNT(*) FROM {SONG_TABLES[view][0]} {where}", params).fetchone()[0]
+
+def fetch_page(con, view, sort, descending=True, search="", page=0, page_size=50) -> pd.DataFrame:
+    """Fetch one sorted, filtered page of a song table from DuckDB.
+
+    Sorting, search and paging all run in SQL and only `page_size` rows come
+    back, so the browser never receives the whole catalogue.
+    """
+    table, columns = SONG_TABLES[view]
+    if sort not in columns:
+        raise ValueError(f"Unknown sort column: {sort}")
+    where, params = song_filter(search)
+    select = ", ".join(f"strftime({c}, '%Y-%m-%d') AS {c}" if c == "release_date" else c for c in columns)
+    rows = con.execute(f"""
+        SELECT {select} FROM {table} {where}
+        ORDER BY {table}.{sort} {"DESC" if descending else "ASC"} NULLS LAST, {table}.song
+        LIMIT ? OFFSET ?
+    """, params + [page_size, page * page_size]).df()
+    rows.index = range(page * page_size + 1, page * page_size + len(rows) + 1)
+    return rows
 
 def fmt(n) -> str:
     if n is None: return "–"
@@ -371,10 +573,418 @@ def status(val, thresholds, labels, colors):
             return labels[i], colors[i]
     return labels[-1], colors[-1]
 
+def section(title):
+    snapshot["section"] = title
+    st.markdown(f'<div class="section-header">{title}</div>', unsafe_allow_html=True)
+
+def kpi_card(container, label, value, help=None, grade=None, note=None, delta=None):
+    container.metric(label, value, delta=delta, help=help)
+    if grade:
+        container.markdown(badge(*grade), unsafe_allow_html=True)
+    if note:
+        container.markdown(insight(*note), unsafe_allow_html=True)
+    record("kpi", {"label": label, "value": value, "delta": delta, "help": help, "grade": grade, "note": note})
+
 def wrap_chart(fig):
     st.markdown('<div class="chart-card">', unsafe_allow_html=True)
     st.plotly_chart(fig, use_container_width=True, config={"displayModeBar": False})
     st.markdown('</div>', unsafe_allow_html=True)
+    record("figure", fig)
+
+def record(kind, item):
+    """Queue a block for the static snapshot; callables are only evaluated when one is written."""
+    snapshot["blocks"].append({"tab": snapshot["tab"], "section": snapshot["section"], "kind": kind, "item": item})
+
+
+# ── Song title matching ──────────────────────────────────────────────────────
+# Titles are the only key in the songs export, so versions ("Dreamy Love (Vocal
+# Remix)") and renamed snapshots are linked to a "work" by normalized title,
+# aliases taken from version brackets, and trigram similarity.
+_VERSION_RE = re.compile(
+    r"(?<![a-z0-9])(?:remix|re-?master(?:ed)?|mix|edit|version|live|acoustic|instrumental|vocal|"
+    r"extended|radio|demo|sped up|slowed|reverb|deluxe|mono|stereo|original|\d{4})(?![a-z0-9])", re.I)
+_FEAT_RE    = re.compile(r"^\s*(?:feat\.?|ft\.?|featuring|with)\s", re.I)
+_BRACKET_RE = re.compile(r"[\(\[]([^\)\]]*)[\)\]]")
+_DASH_RE    = re.compile(r"\s+[-–—]\s+(.*)$")
+_NON_WORD   = re.compile(r"[\W_]+")
+_ACCENT_RE  = re.compile(r"[\u0300-\u036f]")  # generic diacritics only; kana, Indic and Thai marks are letters here
+
+def _clean_title(text) -> str:
+    text = unicodedata.normalize("NFKD", str(text).casefold().replace("&", " and "))
+    text = unicodedata.normalize("NFC", _ACCENT_RE.sub("", text))
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+def _title_key(text) -> str:
+    """_clean_title, or the raw title when nothing is left (e.g. "♥♥♥"), so no two titles share an empty key."""
+    return _clean_title(text) or " ".join(str(text).casefold().split())
+
+def normalize_title(title):
+    """Return (base, aliases): the title without version tags, plus titles named inside them."""
+    title = str(title)
+    aliases = []
+
+    def strip_tag(m):
+        inner = m.group(1)
+        if _FEAT_RE.search(inner):
+            return " "
+        if _VERSION_RE.search(inner):
+            rest = _clean_title(_VERSION_RE.sub(" ", inner))
+            if len(rest) >= 3:
+                aliases.append(rest)
+            return " "
+        return m.group(0)
+
+    base = _BRACKET_RE.sub(strip_tag, title)
+    dash = _DASH_RE.search(base)
+    if dash and _VERSION_RE.search(dash.group(1)):
+        base = base[:dash.start()]
+    base = _clean_title(base) or _title_key(title)
+    return base, [a for a in aliases if a != base]
+
+_NUMBER_RE = re.compile(r"^(?:\d+|x{0,2}(?:ix|iv|v?i{1,3}|v)|x{1,2}|one|two|three|four|five|six|seven|eight|nine|ten|"
+                        r"eleven|twelve|first|second|third)$")
+
+def number_tokens(base) -> list:
+    """Number and numeral tokens of a normalized title ("part 2", "vol ii", "chapter one")."""
+    return sorted(t for t in base.split() if _NUMBER_RE.match(t))
+
+def title_ngrams(text, n=3) -> set:
+    padded = f"{' ' * (n - 1)}{text} "
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+def stable_id(key) -> str:
+    return hashlib.sha1(key.encode()).hexdigest()[:10]
+
+def minhash_candidates(grams, bands=8, rows=3, max_block=200, seed=7):
+    """Yield index pairs that collide in at least one MinHash band (LSH blocking)."""
+    vocab = {}
+    ids   = [[vocab.setdefault(g, len(vocab)) for g in gs] for gs in grams]
+    flat  = np.fromiter((g for row in ids for g in row), dtype=np.int64)
+    starts = np.cumsum([0] + [len(row) for row in ids[:-1]])
+    prime = (1 << 31) - 1
+    rng   = np.random.default_rng(seed)
+    a, b  = rng.integers(1, prime, bands * rows), rng.integers(0, prime, bands * rows)
+    sig   = np.stack([np.minimum.reduceat((a[h] * flat + b[h]) % prime, starts) for h in range(bands * rows)])
+    for band in range(bands):
+        key = np.zeros(len(ids), dtype=np.int64)
+        for row in sig[band * rows:(band + 1) * rows]:
+            key = key * 1_000_003 + row
+        order = np.argsort(key, kind="stable")
+        first = np.flatnonzero(np.r_[True, np.diff(key[order]) != 0])
+        sizes = np.diff(np.r_[first, len(order)])
+        for lo, size in zip(first[sizes > 1], sizes[sizes > 1]):
+            if size <= max_block:
+                block = order[lo:lo + size].tolist()
+                for x in range(size):
+                    for y in block[x + 1:]:
+                        yield block[x], y
+
+@st.cache_data(show_spinner=False)
+def build_work_index(titles, threshold=0.6, max_block=200) -> pd.DataFrame:
+    """Map each title to a stable track_id and work_id.
+
+    Titles sharing a normalized base are linked directly, and a version bracket
+    links a title only when its text is another title's base ("Spooky halloween
+    lake (spooky lake remaster)" -> "Spooky Lake"); bracket text shared by many
+    titles ("Live at Wembley", "Taylor's Version") never links them on its own.
+    The rest are compared by trigram Jaccard similarity within MinHash buckets,
+    so matching stays near-linear; titles whose numbers differ ("Part 1" /
+    "Part 2") are never merged.
+    """
+    titles = list(dict.fromkeys(str(t) for t in titles))
+    keys   = [normalize_title(t) for t in titles]
+    parent = list(range(len(titles)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    owner = {}
+    for i, (base, _) in enumerate(keys):
+        if base in owner:
+            union(i, owner[base])
+        else:
+            owner[base] = i
+    for i, (base, aliases) in enumerate(keys):
+        for alias in aliases:
+            if alias in owner:
+                union(i, owner[alias])
+
+    bases   = list(owner)
+    grams   = [title_ngrams(b) for b in bases]
+    numbers = [number_tokens(b) for b in bases]
+    if len(bases) > 1:
+        for j, k in set(minhash_candidates(grams, max_block=max_block)):
+            if numbers[j] != numbers[k]:
+                continue
+            shared = len(grams[j] & grams[k])
+            if shared / (len(grams[j]) + len(grams[k]) - shared) >= threshold:
+                union(owner[bases[j]], owner[bases[k]])
+
+    members = {}
+    for i in range(len(titles)):
+        members.setdefault(find(i), []).append(i)
+    rows = []
+    for group in members.values():
+        canon = min(group, key=lambda i: (len(keys[i][0]), keys[i][0], len(titles[i]), titles[i]))
+        for i in group:
+            rows.append({"song": titles[i], "track_id": stable_id(_title_key(titles[i])),
+                         "work_id": stable_id(keys[canon][0]), "work": titles[canon]})
+    return pd.DataFrame(rows, columns=["song", "track_id", "work_id", "work"])
+
+
+# ── Period-over-period deltas ────────────────────────────────────────────────
+# The timeline carries running totals (streams_cum, listeners_cum) and a sparse
+# table of listener maxima, so any window's totals and peak are a couple of
+# lookups instead of a rescan, whatever the history length.
+def add_prefix_sums(timeline) -> pd.DataFrame:
+    timeline = timeline.sort_values("date").reset_index(drop=True)
+    timeline["streams_cum"]   = timeline["streams"].cumsum()
+    timeline["listeners_cum"] = timeline["listeners"].cumsum()
+    return timeline
+
+def range_max_table(values) -> list:
+    table = [np.asarray(values)]
+    while 2 ** len(table) <= len(table[0]):
+        prev, half = table[-1], 2 ** (len(table) - 1)
+        table.append(np.maximum(prev[:-half], prev[half:]))
+    return table
+
+def range_max(table, lo, hi):
+    k = (hi - lo).bit_length() - 1
+    return max(table[k][lo], table[k][hi - 2 ** k])
+
+def window_kpis(timeline, peaks, start, end):
+    """KPIs for dates in [start, end) from the prefix-sum columns.
+
+    None if the window is empty or starts before the first day of data, so a
+    partial window is never compared against a full one.
+    """
+    dates  = timeline["date"].to_numpy()
+    lo, hi = (int(i) for i in np.searchsorted(dates, [np.datetime64(start), np.datetime64(end)]))
+    if hi <= lo or np.datetime64(start) < dates[0]:
+        return None
+    def total(col):
+        return int(timeline[col].iat[hi - 1] - (timeline[col].iat[lo - 1] if lo else 0))
+    streams, listeners = total("streams_cum"), total("listeners_cum")
+    followers = int(timeline["followers"].iat[hi - 1])
+    growth    = followers - int(timeline["followers"].iat[lo - 1 if lo else 0])
+    return {
+        "streams":        streams,
+        "peak_listeners": int(range_max(peaks, lo, hi)),
+        "followers":      followers,
+        "growth":         growth,
+        "fcr":            (growth / listeners * 100) if listeners > 0 else None,
+        "stickiness":     (streams / listeners) if listeners > 0 else None,
+    }
+
+def period_delta(cur, prev, key, relative=True, unit=""):
+    if cur is None or prev is None or cur[key] is None or prev[key] is None:
+        return None
+    if not relative:
+        return f"{cur[key] - prev[key]:+.2f}{unit}"
+    if prev[key] == 0:
+        return None
+    return f"{(cur[key] - prev[key]) / abs(prev[key]) * 100:+.1f}%"
+
+
+# ── Badge threshold simulation ───────────────────────────────────────────────
+# Grades every artist × rolling window × day against a whole grid of alternative
+# thresholds at once. Inputs are (artists, days) arrays of running totals, so a
+# window sum is one subtraction and the grading is a single broadcast compare.
+SIM_WINDOWS = [7, 28, 90]
+SIM_KPIS = {  # same benchmarks as the health badges above
+    "Fan Conversion Rate": {"healthy": 2.0, "low": 0.5, "unit": "%"},
+    "Content Stickiness":  {"healthy": 3.0, "low": 1.5, "unit": "x"},
+}
+
+def window_changes(levels, windows) -> np.ndarray:
+    """Change of (A, T) level series over each window, as (A, K, T); NaN until a day precedes the window.
+
+    Windows count rows, i.e. days in a daily export: day t is compared with
+    day t - w, so followers give growth over the window like window_kpis().
+    """
+    levels = np.asarray(levels, dtype=float)
+    ends   = np.arange(levels.shape[1])
+    starts = ends[None, :] - np.asarray(windows)[:, None]
+    diffs  = levels[:, None, :] - levels[:, np.clip(starts, 0, None)]
+    return np.where(starts >= 0, diffs, np.nan)
+
+def window_sums(running, windows) -> np.ndarray:
+    """Rolling-window sums of (A, T) running totals, as (A, K, T); NaN before a full window.
+
+    A running total is zero before the first day, so the sums are changes of
+    the zero-padded series and the first full window includes day one.
+    """
+    running = np.asarray(running, dtype=float)
+    padded  = np.concatenate([np.zeros((running.shape[0], 1)), running], axis=1)
+    return window_changes(padded, windows)[..., 1:]
+
+def rolling_kpis(streams_cum, listeners_cum, followers, windows) -> dict:
+    streams, listeners = window_sums(streams_cum, windows), window_sums(listeners_cum, windows)
+    growth    = window_changes(followers, windows)
+    listeners = np.where(listeners > 0, listeners, np.nan)
+    return {"Fan Conversion Rate": growth / listeners * 100, "Content Stickiness": streams / listeners}
+
+def grade_days(values, healthy, low) -> np.ndarray:
+    """Badge per day like status(): 2 Healthy, 1 Low, 0 Critical, -1 where undefined."""
+    graded = np.where(values >= healthy, 2, np.where(values >= low, 1, 0))
+    return np.where(np.isnan(values), -1, graded)
+
+def badge_shares(values, healthy_grid, low_grid) -> dict:
+    """Share of defined days graded Healthy / Low / Critical for every threshold pair.
+
+    values is (A, K, T); the result arrays are (A, K, len(healthy_grid), len(low_grid)),
+    NaN where low >= healthy.
+    """
+    healthy_grid, low_grid = np.asarray(healthy_grid, float), np.asarray(low_grid, float)
+    days    = (~np.isnan(values)).sum(-1)[..., None, None]
+    above_h = (values[..., None] >= healthy_grid).sum(-2)[..., :, None]
+    above_l = (values[..., None] >= low_grid).sum(-2)[..., None, :]
+    ordered = low_grid[None, :] < healthy_grid[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        healthy  = np.where(ordered, above_h / days, np.nan)
+        critical = np.where(ordered, 1 - above_l / days, np.nan)
+    return {"Healthy": healthy, "Low": 1 - healthy - critical, "Critical": critical}
+
+
+# ── Static snapshots ─────────────────────────────────────────────────────────
+# Every KPI card, chart and table rendered below is also recorded here, and once
+# per data version the recording is written to static/snapshots/ as a
+# self-contained page that Streamlit serves without running this script.
+SNAPSHOT_DIR = Path(__file__).parent / "static" / "snapshots"
+snapshot = {"tab": "Overview", "section": "", "blocks": []}
+# Widget values a snapshot is rendered with, whatever the publishing session had chosen.
+SNAPSHOT_DEFAULTS = {"song_view": "Track", "compare_days": 28, "sim_kpi": "Fan Conversion Rate", "sim_window": 28}
+
+SNAPSHOT_PAGE = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<script src="../../plotly.min.js"></script>
+<style>
+body {{ background:{cream}; color:{dark}; font-family:Inter,-apple-system,sans-serif; margin:0; }}
+main {{ max-width:1400px; margin:0 auto; padding:2rem 3rem 4rem; }}
+h1 {{ font-size:2.2rem; font-weight:900; margin:0 0 4px; }}
+nav a {{ display:inline-block; margin:16px 8px 0 0; padding:8px 18px; border-radius:8px; background:{light};
+        color:{dark}; font-weight:600; text-decoration:none; }}
+h2 {{ font-size:1.4rem; margin:40px 0 0; }}
+.section-header {{ font-size:1.1rem; font-weight:800; border-left:4px solid {accent}; padding-left:12px; margin:32px 0 16px; }}
+.cards {{ display:grid; grid-template-columns:repeat(auto-fit, minmax(220px, 1fr)); gap:16px; }}
+.card {{ background:#fff; border-radius:14px; padding:20px 22px; border:1.5px solid {mid}; }}
+.card .label {{ color:{light_text}; font-size:0.72rem; font-weight:600; text-transform:uppercase; letter-spacing:0.08em; }}
+.card .value {{ font-size:1.8rem; font-weight:800; letter-spacing:-0.02em; }}
+.delta {{ font-size:0.85rem; font-weight:600; }}
+.delta.up {{ color:#2d6a4f; }}
+.delta.down {{ color:#9b2226; }}
+.badge {{ display:inline-block; padding:4px 12px; border-radius:50px; font-size:0.78rem; font-weight:700; margin-top:6px; }}
+.insight-card {{ background:#fff; border-radius:12px; padding:16px 20px; border:1.5px solid {mid}; margin-top:8px;
+                 font-size:0.85rem; color:{mid_text}; line-height:1.5; }}
+.chart-card {{ background:#fff; border-radius:14px; border:1.5px solid {mid}; padding:8px; margin-bottom:8px; }}
+table {{ border-collapse:collapse; width:100%; background:#fff; font-size:0.85rem; }}
+th, td {{ padding:6px 10px; border-bottom:1px solid {mid}; text-align:left; }}
+small {{ color:{light_text}; }}
+</style></head>
+<body><main>
+<h1>{title}</h1><small>Data version {version} · generated {created}</small>
+<nav>{nav}</nav>
+{body}
+</main>
+<script>
+const FIGURES = {figures};
+FIGURES.forEach((fig, i) => Plotly.newPlot("fig-" + i, fig.data, fig.layout, {{displayModeBar: false, responsive: true}}));
+</script>
+</body></html>
+"""
+
+def render_snapshot(bundle) -> str:
+    tabs, parts, figures = [], [], []
+    for block in bundle["blocks"]:
+        if block["tab"] not in tabs:
+            tabs.append(block["tab"])
+            parts.append(f'<h2 id="tab-{len(tabs)}">{block["tab"]}</h2>')
+        parts.append(f'<div class="section-header">{block["section"]}</div>')
+        if block["kind"] == "kpis":
+            cards = []
+            for k in block["items"]:
+                extra  = badge(*k["grade"]) if k["grade"] else ""
+                extra += insight(*k["note"]) if k["note"] else ""
+                if k.get("delta"):
+                    extra = f'<div class="delta {"down" if k["delta"].startswith("-") else "up"}">{k["delta"]}</div>' + extra
+                cards.append(f'<div class="card" title="{k["help"] or ""}"><div class="label">{k["label"]}</div>'
+                             f'<div class="value">{k["value"]}</div>{extra}</div>')
+            parts.append(f'<div class="cards">{"".join(cards)}</div>')
+        elif block["kind"] == "figure":
+            parts.append(f'<div class="chart-card" id="fig-{len(figures)}"></div>')
+            figures.append(block["item"])
+        else:
+            table = pd.DataFrame(block["item"]["data"], columns=block["item"]["columns"])
+            parts.append(table.to_html(index=False, border=0))
+    return SNAPSHOT_PAGE.format(
+        title=f"{bundle['artist']} · Spotify Analytics", version=bundle["version"], created=bundle["created"],
+        nav="".join(f'<a href="#tab-{i}">{t}</a>' for i, t in enumerate(tabs, 1)),
+        body="\n".join(parts), figures=json.dumps(figures).replace("</", "<\\/"),
+        cream=CREAM, dark=TEXT_DARK, mid_text=TEXT_MID, light_text=TEXT_LIGHT, light=LIGHT_GRAY,
+        mid=MID_GRAY, accent=TERRACOTTA)
+
+def snapshot_location(artist, version):
+    slug = re.sub(r"[^a-z0-9]+", "-", artist.lower()).strip("-")
+    return SNAPSHOT_DIR / slug / version, f"app/static/snapshots/{slug}/{version}/index.html"
+
+def publish_snapshot(artist, version, write=True):
+    """Write the recorded dashboard once per data version and return its static URL.
+
+    Returns None when there is no snapshot: `write` is off, or the static
+    folder cannot be written (e.g. a read-only deploy).
+    """
+    dest, url = snapshot_location(artist, version)
+    if dest.exists():
+        return url
+    if not write:
+        return None
+
+    blocks = []
+    for b in snapshot["blocks"]:
+        item = b["item"]() if callable(b["item"]) else b["item"]
+        if b["kind"] == "kpi":
+            if blocks and blocks[-1]["kind"] == "kpis" and blocks[-1]["section"] == b["section"]:
+                blocks[-1]["items"].append(item)
+            else:
+                blocks.append({"tab": b["tab"], "section": b["section"], "kind": "kpis", "items": [item]})
+        elif b["kind"] == "figure":
+            blocks.append({**b, "item": json.loads(item.to_json())})
+        else:
+            blocks.append({**b, "item": json.loads(item.to_json(orient="split", index=False, date_format="iso"))})
+    bundle = {"artist": artist, "version": version,
+              "created": pd.Timestamp.now(tz="UTC").strftime("%Y-%m-%d %H:%M UTC"), "blocks": blocks}
+
+    # Sessions share one process, so every write goes through its own temp dir and
+    # is moved into place whole; concurrent publishers never see half a file.
+    root, tmp = dest.parent, None
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=root, prefix=f".{version}."))
+        if not (SNAPSHOT_DIR / "plotly.min.js").exists():
+            (tmp / "plotly.min.js").write_text(get_plotlyjs(), encoding="utf-8")
+            os.replace(tmp / "plotly.min.js", SNAPSHOT_DIR / "plotly.min.js")
+        (tmp / "bundle.json").write_text(json.dumps(bundle), encoding="utf-8")
+        (tmp / "index.html").write_text(render_snapshot(bundle), encoding="utf-8")
+        tmp.chmod(0o755)  # mkdtemp is owner-only
+        tmp.rename(dest)
+        (root / "index.html").write_text(
+            f'<meta http-equiv="refresh" content="0; url={version}/index.html">', encoding="utf-8")
+    except OSError:
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return url if dest.exists() else None
+    return url
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -383,7 +993,7 @@ def wrap_chart(fig):
 st.markdown(f"""
 <div class="hero">
   <div class="hero-left">
-    <h1>🐸 Blue Frog Analytics</h1>
+    <h1>🐸 {ARTIST} Analytics</h1>
     <p>Spotify performance dashboard · powered by DuckDB</p>
   </div>
   <a class="hero-cta" href="https://open.spotify.com/artist/1j71gO9gHulj7w1KXBtDXi" target="_blank">
@@ -415,13 +1025,13 @@ with col_right:
 
     u1, u2 = st.columns(2, gap="medium")
     with u1:
-        st.markdown('<p class="upload-title">📅 Audience Timeline</p><p class="upload-sub">date · listeners · streams · followers</p>', unsafe_allow_html=True)
-        timeline_file = st.file_uploader("", type="csv", key="timeline", label_visibility="collapsed")
+        st.markdown('<p class="upload-title">📅 Audience Timeline</p><p class="upload-sub">date · listeners · streams · followers — CSVs or a zip</p>', unsafe_allow_html=True)
+        timeline_files = st.file_uploader("", type=["csv", "zip"], key="timeline", accept_multiple_files=True, label_visibility="collapsed")
     with u2:
-        st.markdown('<p class="upload-title">🎵 Songs Data</p><p class="upload-sub">song · listeners · streams · saves · release_date</p>', unsafe_allow_html=True)
-        songs_file = st.file_uploader("", type="csv", key="songs", label_visibility="collapsed")
+        st.markdown('<p class="upload-title">🎵 Songs Data</p><p class="upload-sub">song · listeners · streams · saves · release_date — CSVs or a zip</p>', unsafe_allow_html=True)
+        songs_files = st.file_uploader("", type=["csv", "zip"], key="songs", accept_multiple_files=True, label_visibility="collapsed")
 
-    if not timeline_file or not songs_file:
+    if not timeline_files and not songs_files:
         st.markdown(f"""
         <div style="background:{WHITE};border-radius:12px;padding:24px 28px;border:1.5px solid {MID_GRAY};margin-top:8px;">
           <p style="font-weight:800;margin:0 0 16px 0;font-size:0.95rem;color:{TEXT_DARK};">📥 How to export from Spotify for Artists</p>
@@ -439,7 +1049,7 @@ with col_right:
 
 st.markdown('<hr class="divider">', unsafe_allow_html=True)
 
-if not timeline_file or not songs_file:
+if not timeline_files and not songs_files:
     st.stop()
 
 
@@ -447,22 +1057,47 @@ if not timeline_file or not songs_file:
 # LOAD DATA
 # ═══════════════════════════════════════════════════════════════════════════════
 with st.spinner(""):
-    timeline_df = load_csv(timeline_file.read())
-    songs_df    = load_csv(songs_file.read())
-
-    timeline_df["date"]         = pd.to_datetime(timeline_df["date"])
-    songs_df["release_date"]    = pd.to_datetime(songs_df["release_date"])
+    results = ([ingest_upload(f.file_id, f, "timeline") for f in timeline_files] +
+               [ingest_upload(f.file_id, f, "songs") for f in songs_files])
+    timeline_df = merge_exports(results, "timeline")
+    songs_df    = merge_exports(results, "songs")
+
+rejected_count = sum(r["rejected_count"] for r in results)
+ingest_errors  = [e for r in results for e in r["errors"]]
+if rejected_count or ingest_errors:
+    with st.expander(f"⚠️ Ingest report — {rejected_count:,} row(s) rejected, {len(ingest_errors)} file(s) skipped"):
+        for e in ingest_errors:
+            st.markdown(f"- {e}")
+        if rejected_count:
+            rejected = (pd.concat([f for r in results for f in r["rejected"]], ignore_index=True)
+                          .sort_values(["file", "line"], kind="stable"))
+            st.caption(f"Showing the first {len(rejected):,} rejected row(s).")
+            st.dataframe(rejected[["file", "line", "reason"] + [c for c in rejected.columns if c not in ("file", "line", "reason")]],
+                         use_container_width=True, hide_index=True)
+
+missing = [label for label, df in [("Audience Timeline", timeline_df), ("Songs", songs_df)] if df.empty]
+if missing:
+    st.warning(f"No valid rows yet for: {' and '.join(missing)}. Upload a matching export to unlock the dashboard.")
+    st.stop()
 
-    for col in ["listeners", "streams", "followers"]:
-        if col in timeline_df.columns:
-            timeline_df[col] = pd.to_numeric(timeline_df[col], errors="coerce").fillna(0).astype(int)
-    for col in ["listeners", "streams", "saves"]:
-        if col in songs_df.columns:
-            songs_df[col] = pd.to_numeric(songs_df[col], errors="coerce").fillna(0).astype(int)
+with st.spinner(""):
+    data_version = hashlib.sha1(pd.util.hash_pandas_object(timeline_df, index=False).values.tobytes() +
+                                pd.util.hash_pandas_object(songs_df, index=False).values.tobytes()).hexdigest()[:12]
+    timeline_df = add_prefix_sums(timeline_df)
+    works = build_work_index(tuple(songs_df["song"].astype(str))).set_index("song")
+    songs_df[["track_id", "work_id", "work"]] = works.reindex(songs_df["song"].astype(str)).to_numpy()
 
     con = duckdb.connect(":memory:")
     register_tables(con, timeline_df, songs_df)
 
+# The first full run on a new data version publishes the static snapshot, so it
+# starts from the default view rather than whatever this session had selected.
+attempted    = st.session_state.setdefault("snapshot_versions", set())
+snapshot_due = not snapshot_location(ARTIST, data_version)[0].exists() and data_version not in attempted
+for key, value in SNAPSHOT_DEFAULTS.items():
+    if snapshot_due or key not in st.session_state:
+        st.session_state[key] = value
+
 tl = timeline_df.copy()
 
 
@@ -485,17 +1120,26 @@ save_rate_by_listeners = (total_saves / total_listeners * 100) if total_listener
 
 G, Y, R = "#2d6a4f", "#b5770d", "#9b2226"
 
+compare_days = st.session_state["compare_days"]
+period_end   = tl["date"].max() + pd.Timedelta(days=1)
+peaks        = range_max_table(tl["listeners"].to_numpy())
+cur_kpis     = window_kpis(tl, peaks, period_end - pd.Timedelta(days=compare_days), period_end)
+prev_kpis    = window_kpis(tl, peaks, period_end - pd.Timedelta(days=2 * compare_days),
+                           period_end - pd.Timedelta(days=compare_days))
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # ROW 1 — KEY METRICS
 # ═══════════════════════════════════════════════════════════════════════════════
-st.markdown('<div class="section-header">Key Metrics</div>', unsafe_allow_html=True)
+section("Key Metrics")
+st.selectbox("Compare period", [7, 28, 90, 365], key="compare_days",
+             format_func=lambda d: f"Deltas: last {d} days vs previous {d} days", label_visibility="collapsed")
 m1, m2, m3, m4, m5 = st.columns(5, gap="medium")
-m1.metric("🎧 Total Streams",   fmt(total_streams))
-m2.metric("👥 Peak Listeners",  fmt(max_listeners))
-m3.metric("❤️ Followers",       fmt(total_followers))
-m4.metric("📈 Follower Growth", f"+{fmt(follower_growth)}")
-m5.metric("🎵 Catalogue",       f"{total_songs} tracks")
+kpi_card(m1, "🎧 Total Streams",   fmt(total_streams),           delta=period_delta(cur_kpis, prev_kpis, "streams"))
+kpi_card(m2, "👥 Peak Listeners",  fmt(max_listeners),           delta=period_delta(cur_kpis, prev_kpis, "peak_listeners"))
+kpi_card(m3, "❤️ Followers",       fmt(total_followers),         delta=period_delta(cur_kpis, prev_kpis, "followers"))
+kpi_card(m4, "📈 Follower Growth", f"+{fmt(follower_growth)}",   delta=period_delta(cur_kpis, prev_kpis, "growth"))
+kpi_card(m5, "🎵 Catalogue",       f"{total_songs} tracks")
 
 st.markdown('<hr class="divider">', unsafe_allow_html=True)
 
@@ -503,30 +1147,26 @@ st.markdown('<hr class="divider">', unsafe_allow_html=True)
 # ═══════════════════════════════════════════════════════════════════════════════
 # ROW 2 — ADVANCED HEALTH KPIs
 # ═══════════════════════════════════════════════════════════════════════════════
-st.markdown('<div class="section-header">Advanced Health KPIs</div>', unsafe_allow_html=True)
+section("Advanced Health KPIs")
 h1, h2, h3 = st.columns(3, gap="medium")
 
 fcr_lbl, fcr_col = status(fcr, [2, 0.5], ["🟢 Healthy", "🟡 Low"], [G, Y]) if fcr >= 0.5 else ("🔴 Critical", R)
 stk_lbl, stk_col = status(stickiness, [3, 1.5], ["🟢 Strong", "🟡 Low"], [G, Y]) if stickiness >= 1.5 else ("🔴 Very Low", R)
 sav_lbl, sav_col = status(save_rate_stream, [6, 2], ["🟢 Healthy", "🟡 Low"], [G, Y]) if save_rate_stream >= 2 else ("🔴 Danger", R)
 
-with h1:
-    st.metric("🎯 Fan Conversion Rate", f"{fcr:.2f}%", help="New Followers ÷ Total Listeners × 100. Benchmark: 2%+")
-    st.markdown(badge(fcr_lbl, fcr_col), unsafe_allow_html=True)
-    msg = "Only 1 in 1,000 listeners is following. Work on your profile — bio, photos, pinned track." if fcr < 0.5 else ("Decent but room to grow. Pin your best track and improve your artist bio." if fcr < 2 else "Great conversion — you're turning listeners into real fans!")
-    st.markdown(insight(msg, "⚠️" if fcr < 0.5 else ("💡" if fcr < 2 else "✅")), unsafe_allow_html=True)
+msg = "Only 1 in 1,000 listeners is following. Work on your profile — bio, photos, pinned track." if fcr < 0.5 else ("Decent but room to grow. Pin your best track and improve your artist bio." if fcr < 2 else "Great conversion — you're turning listeners into real fans!")
+kpi_card(h1, "🎯 Fan Conversion Rate", f"{fcr:.2f}%", help="New Followers ÷ Total Listeners × 100. Benchmark: 2%+",
+         delta=period_delta(cur_kpis, prev_kpis, "fcr", relative=False, unit=" pts"),
+         grade=(fcr_lbl, fcr_col), note=(msg, "⚠️" if fcr < 0.5 else ("💡" if fcr < 2 else "✅")))
 
-with h2:
-    st.metric("🔁 Content Stickiness", f"{stickiness:.2f}x", help="Total Streams ÷ Total Listeners. Benchmark: 3x+")
-    st.markdown(badge(stk_lbl, stk_col), unsafe_allow_html=True)
-    msg = "Listeners aren't replaying. Focus on stronger hooks and cohesive EPs." if stickiness < 1.5 else ("Some replays but below 3x. Try releasing music in thematic series." if stickiness < 3 else "Listeners are hooked and keep coming back!")
-    st.markdown(insight(msg, "⚠️" if stickiness < 1.5 else ("💡" if stickiness < 3 else "✅")), unsafe_allow_html=True)
+msg = "Listeners aren't replaying. Focus on stronger hooks and cohesive EPs." if stickiness < 1.5 else ("Some replays but below 3x. Try releasing music in thematic series." if stickiness < 3 else "Listeners are hooked and keep coming back!")
+kpi_card(h2, "🔁 Content Stickiness", f"{stickiness:.2f}x", help="Total Streams ÷ Total Listeners. Benchmark: 3x+",
+         delta=period_delta(cur_kpis, prev_kpis, "stickiness", relative=False, unit="x"),
+         grade=(stk_lbl, stk_col), note=(msg, "⚠️" if stickiness < 1.5 else ("💡" if stickiness < 3 else "✅")))
 
-with h3:
-    st.metric("💾 Save-to-Stream Ratio", f"{save_rate_stream:.2f}%", help="Total Saves ÷ Total Streams × 100. Benchmark: 6–10%")
-    st.markdown(badge(sav_lbl, sav_col), unsafe_allow_html=True)
-    msg = "Almost nobody is saving. This is a major red flag — focus on memorable, replayable melodies." if save_rate_stream < 2 else ("Below benchmark. Shorter, hookier tracks tend to drive more saves." if save_rate_stream < 6 else "Healthy save rate — listeners want your music in their library!")
-    st.markdown(insight(msg, "⚠️" if save_rate_stream < 2 else ("💡" if save_rate_stream < 6 else "✅")), unsafe_allow_html=True)
+msg = "Almost nobody is saving. This is a major red flag — focus on memorable, replayable melodies." if save_rate_stream < 2 else ("Below benchmark. Shorter, hookier tracks tend to drive more saves." if save_rate_stream < 6 else "Healthy save rate — listeners want your music in their library!")
+kpi_card(h3, "💾 Save-to-Stream Ratio", f"{save_rate_stream:.2f}%", help="Total Saves ÷ Total Streams × 100. Benchmark: 6–10%",
+         grade=(sav_lbl, sav_col), note=(msg, "⚠️" if save_rate_stream < 2 else ("💡" if save_rate_stream < 6 else "✅")))
 
 st.markdown('<hr class="divider">', unsafe_allow_html=True)
 
@@ -534,33 +1174,26 @@ st.markdown('<hr class="divider">', unsafe_allow_html=True)
 # ═══════════════════════════════════════════════════════════════════════════════
 # ROW 3 — ENGAGEMENT DEPTH KPIs
 # ═══════════════════════════════════════════════════════════════════════════════
-st.markdown('<div class="section-header">Engagement Depth KPIs</div>', unsafe_allow_html=True)
+section("Engagement Depth KPIs")
 e1, e2, e3, e4 = st.columns(4, gap="medium")
 
 slr_lbl, slr_col = status(stream_listener_ratio, [2.0, 1.2], ["🟢 Healthy", "🟡 Low"], [G, Y]) if stream_listener_ratio >= 1.2 else ("🔴 Very Low", R)
 svl_lbl, svl_col = status(save_rate_by_listeners, [10, 3], ["🟢 Healthy", "🟡 Low"], [G, Y]) if save_rate_by_listeners >= 3 else ("🔴 Danger", R)
 
-with e1:
-    st.metric("🔂 Stream / Listener", f"{stream_listener_ratio:.2f}x", help="Total Streams ÷ Unique Listeners. Benchmark: 2.0+")
-    st.markdown(badge(slr_lbl, slr_col), unsafe_allow_html=True)
-    msg = "People aren't replaying — songs may not be hooking listeners in." if stream_listener_ratio < 1.2 else ("Some replays but below the 2.0x benchmark." if stream_listener_ratio < 2.0 else "Strong replays — listeners keep coming back!")
-    st.markdown(insight(msg, "⚠️" if stream_listener_ratio < 1.2 else ("💡" if stream_listener_ratio < 2.0 else "✅")), unsafe_allow_html=True)
+msg = "People aren't replaying — songs may not be hooking listeners in." if stream_listener_ratio < 1.2 else ("Some replays but below the 2.0x benchmark." if stream_listener_ratio < 2.0 else "Strong replays — listeners keep coming back!")
+kpi_card(e1, "🔂 Stream / Listener", f"{stream_listener_ratio:.2f}x", help="Total Streams ÷ Unique Listeners. Benchmark: 2.0+",
+         delta=period_delta(cur_kpis, prev_kpis, "stickiness", relative=False, unit="x"),
+         grade=(slr_lbl, slr_col), note=(msg, "⚠️" if stream_listener_ratio < 1.2 else ("💡" if stream_listener_ratio < 2.0 else "✅")))
 
-with e2:
-    st.metric("💿 Save Rate (Listeners)", f"{save_rate_by_listeners:.2f}%", help="Saves ÷ Listeners × 100. Benchmark: 3–10%")
-    st.markdown(badge(svl_lbl, svl_col), unsafe_allow_html=True)
-    msg = "Very few listeners are saving — suggests passive or bot listening." if save_rate_by_listeners < 3 else ("Decent but aim for 10%+. Try music that rewards repeated listens." if save_rate_by_listeners < 10 else "Strong save rate — your audience is genuinely engaged!")
-    st.markdown(insight(msg, "⚠️" if save_rate_by_listeners < 3 else ("💡" if save_rate_by_listeners < 10 else "✅")), unsafe_allow_html=True)
+msg = "Very few listeners are saving — suggests passive or bot listening." if save_rate_by_listeners < 3 else ("Decent but aim for 10%+. Try music that rewards repeated listens." if save_rate_by_listeners < 10 else "Strong save rate — your audience is genuinely engaged!")
+kpi_card(e2, "💿 Save Rate (Listeners)", f"{save_rate_by_listeners:.2f}%", help="Saves ÷ Listeners × 100. Benchmark: 3–10%",
+         grade=(svl_lbl, svl_col), note=(msg, "⚠️" if save_rate_by_listeners < 3 else ("💡" if save_rate_by_listeners < 10 else "✅")))
 
-with e3:
-    st.metric("⏭️ Skip Rate", "N/A", help="Skips ÷ Total Plays. Benchmark: under 25%")
-    st.markdown(badge("⚪ Not in CSV", "#6c757d"), unsafe_allow_html=True)
-    st.markdown(insight("Requires Spotify for Artists advanced export. Benchmark: under 25% skips.", "📊"), unsafe_allow_html=True)
+kpi_card(e3, "⏭️ Skip Rate", "N/A", help="Skips ÷ Total Plays. Benchmark: under 25%",
+         grade=("⚪ Not in CSV", "#6c757d"), note=("Requires Spotify for Artists advanced export. Benchmark: under 25% skips.", "📊"))
 
-with e4:
-    st.metric("🎯 Intent Rate", "N/A", help="Streams from Profile/Library ÷ Total Streams. Benchmark: 20%+")
-    st.markdown(badge("⚪ Not in CSV", "#6c757d"), unsafe_allow_html=True)
-    st.markdown(insight("Requires stream source breakdown from Spotify for Artists. Benchmark: 20%+.", "📊"), unsafe_allow_html=True)
+kpi_card(e4, "🎯 Intent Rate", "N/A", help="Streams from Profile/Library ÷ Total Streams. Benchmark: 20%+",
+         grade=("⚪ Not in CSV", "#6c757d"), note=("Requires stream source breakdown from Spotify for Artists. Benchmark: 20%+.", "📊"))
 
 st.markdown('<hr class="divider">', unsafe_allow_html=True)
 
@@ -573,7 +1206,8 @@ tab1, tab2, tab3, tab4 = st.tabs(["  📈  Audience Trends  ", "  🎵  Song Per
 
 # ── TAB 1: AUDIENCE TRENDS ────────────────────────────────────────────────────
 with tab1:
-    st.markdown('<div class="section-header">Streams · Listeners · Followers Over Time</div>', unsafe_allow_html=True)
+    snapshot["tab"] = "📈 Audience Trends"
+    section("Streams · Listeners · Followers Over Time")
 
     fig = make_subplots(rows=3, cols=1, shared_xaxes=True,
                         subplot_titles=("Streams", "Listeners", "Followers"),
@@ -596,7 +1230,7 @@ with tab1:
 
     c_l, c_r = st.columns(2, gap="medium")
     with c_l:
-        st.markdown('<div class="section-header">7-Day Rolling Average</div>', unsafe_allow_html=True)
+        section("7-Day Rolling Average")
         tl_roll = tl.set_index("date").sort_index()
         tl_roll["streams_7d"]   = tl_roll["streams"].rolling(7).mean()
         tl_roll["listeners_7d"] = tl_roll["listeners"].rolling(7).mean()
@@ -612,7 +1246,7 @@ with tab1:
         wrap_chart(fig2)
 
     with c_r:
-        st.markdown('<div class="section-header">Avg Streams by Day of Week</div>', unsafe_allow_html=True)
+        section("Avg Streams by Day of Week")
         tl_dow = tl.copy()
         tl_dow["dow"] = tl_dow["date"].dt.day_name()
         dow_order = ["Monday","Tuesday","Wednesday","Thursday","Friday","Saturday","Sunday"]
@@ -625,7 +1259,7 @@ with tab1:
         fig4.update_yaxes(showgrid=True, gridcolor=LIGHT_GRAY)
         wrap_chart(fig4)
 
-    st.markdown('<div class="section-header">Monthly Stream Volume</div>', unsafe_allow_html=True)
+    section("Monthly Stream Volume")
     monthly = con.execute("""
         SELECT strftime(date, '%Y-%m') AS month,
                SUM(streams) AS total_streams, AVG(listeners) AS avg_listeners
@@ -643,13 +1277,19 @@ with tab1:
 
 # ── TAB 2: SONG PERFORMANCE ───────────────────────────────────────────────────
 with tab2:
-    songs_sorted = songs_df.sort_values("streams", ascending=False).reset_index(drop=True)
-    songs_sorted.index += 1
+    snapshot["tab"] = "🎵 Song Performance"
+    song_view = st.radio("Group songs by", ["Track", "Work"], horizontal=True, key="song_view",
+                         help="Work merges remixes, remasters and renamed versions of the same song.")
+    song_table = SONG_TABLES[song_view][0]
+    ranked = con.execute(f"""
+        SELECT song, streams, SUM(streams) OVER () AS total_streams, COUNT(*) OVER () AS n
+        FROM {song_table} ORDER BY streams DESC, song LIMIT 10
+    """).df()
 
     s_l, s_r = st.columns([3, 2], gap="large")
     with s_l:
-        st.markdown('<div class="section-header">Top 10 Songs by Streams</div>', unsafe_allow_html=True)
-        top10 = songs_sorted.head(10)
+        section("Top 10 Songs by Streams")
+        top10 = ranked[["song", "streams"]]
         fig5 = px.bar(top10, x="streams", y="song", orientation="h",
                       color="streams", color_continuous_scale=SCALE,
                       labels={"streams": "Total Streams", "song": ""})
@@ -661,11 +1301,11 @@ with tab2:
         wrap_chart(fig5)
 
     with s_r:
-        st.markdown('<div class="section-header">Stream Share</div>', unsafe_allow_html=True)
-        pie_df = songs_sorted.copy()
-        if len(pie_df) > 8:
+        section("Stream Share")
+        pie_df = ranked[["song", "streams"]]
+        if len(ranked) and ranked["n"].iat[0] > 8:
             top8  = pie_df.head(8)
-            other = pd.DataFrame([{"song": "Other", "streams": pie_df.iloc[8:]["streams"].sum()}])
+            other = pd.DataFrame([{"song": "Other", "streams": ranked["total_streams"].iat[0] - top8["streams"].sum()}])
             pie_df = pd.concat([top8, other], ignore_index=True)
         fig7 = px.pie(pie_df, values="streams", names="song",
                       color_discrete_sequence=PALETTE, hole=0.45)
@@ -675,20 +1315,33 @@ with tab2:
                            legend=dict(orientation="v", font=dict(size=11)))
         wrap_chart(fig7)
 
-    st.markdown('<div class="section-header">Full Song Catalogue</div>', unsafe_allow_html=True)
-    display_songs = songs_sorted.copy()
-    display_songs["release_date"] = display_songs["release_date"].dt.strftime("%Y-%m-%d")
+    section("Full Song Catalogue")
+    columns = SONG_TABLES[song_view][1]
+    c1, c2, c3, c4 = st.columns([3, 2, 2, 1], gap="small")
+    search    = c1.text_input("Search", placeholder="Search titles…", key="song_search").strip()
+    sort      = c2.selectbox("Sort by", columns, index=columns.index("streams"), key="song_sort")
+    direction = c3.selectbox("Order", ["Descending", "Ascending"], key="song_order")
+    page_size = c4.selectbox("Rows", [25, 50, 100], index=1, key="song_page_size")
+    total = count_rows(con, song_view, search)
+    pages = max(1, -(-total // page_size))
+    page  = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, step=1) - 1
+    display_songs = fetch_page(con, song_view, sort, direction == "Descending", search, page, page_size)
+    max_streams = con.execute(f"SELECT MAX(streams) FROM {song_table}").fetchone()[0] or 0
     st.dataframe(display_songs, use_container_width=True, height=320,
                  column_config={
                      "streams": st.column_config.ProgressColumn("Streams", format="%d", min_value=0,
-                                                                  max_value=int(songs_sorted["streams"].max())),
+                                                                  max_value=int(max_streams)),
                      "saves":   st.column_config.NumberColumn("Saves", format="%d"),
                  })
+    st.caption(f"Rows {page * page_size + min(1, len(display_songs))}–{page * page_size + len(display_songs)} of {total:,}")
+    # The snapshot gets the whole catalogue in default order, not the page on screen.
+    record("table", lambda: fetch_page(con, song_view, "streams", page_size=max(1, count_rows(con, song_view))))
 
 
 # ── TAB 3: RELEASE INTELLIGENCE ──────────────────────────────────────────────
 with tab3:
-    st.markdown('<div class="section-header">Stream Performance by Release Date</div>', unsafe_allow_html=True)
+    snapshot["tab"] = "📅 Release Intelligence"
+    section("Stream Performance by Release Date")
     songs_rel = songs_df.sort_values("release_date").copy()
     fig8 = px.scatter(songs_rel, x="release_date", y="streams",
                       size="streams", color="streams", color_continuous_scale=SCALE,
@@ -705,7 +1358,7 @@ with tab3:
 
     r1, r2 = st.columns(2, gap="medium")
     with r1:
-        st.markdown('<div class="section-header">Tracks Released per Month</div>', unsafe_allow_html=True)
+        section("Tracks Released per Month")
         fig9 = px.bar(monthly_rel, x="release_month", y="tracks",
                       color="tracks", color_continuous_scale=SCALE,
                       labels={"tracks": "# Tracks", "release_month": ""})
@@ -716,7 +1369,7 @@ with tab3:
         wrap_chart(fig9)
 
     with r2:
-        st.markdown('<div class="section-header">Streams per Release Month</div>', unsafe_allow_html=True)
+        section("Streams per Release Month")
         fig10 = px.bar(monthly_rel, x="release_month", y="total_streams",
                        color="total_streams", color_continuous_scale=SCALE,
                        labels={"total_streams": "Streams", "release_month": ""})
@@ -726,7 +1379,7 @@ with tab3:
         fig10.update_yaxes(showgrid=True, gridcolor=LIGHT_GRAY)
         wrap_chart(fig10)
 
-    st.markdown('<div class="section-header">Avg Streams per Track by Release Month</div>', unsafe_allow_html=True)
+    section("Avg Streams per Track by Release Month")
     efficiency = con.execute("""
         SELECT strftime(release_date, '%Y-%m') AS release_month,
                COUNT(*) AS tracks, SUM(streams) AS total_streams,
@@ -745,15 +1398,14 @@ with tab3:
 
 # ── TAB 4: DEEP DIVE ─────────────────────────────────────────────────────────
 with tab4:
+    snapshot["tab"] = "🔍 Deep Dive"
     d1, d2 = st.columns(2, gap="medium")
 
     with d1:
-        st.markdown('<div class="section-header">Cumulative Streams</div>', unsafe_allow_html=True)
-        tl_cum = tl.sort_values("date").copy()
-        tl_cum["cumulative_streams"] = tl_cum["streams"].cumsum()
-        fig12 = px.area(tl_cum, x="date", y="cumulative_streams",
+        section("Cumulative Streams")
+        fig12 = px.area(tl, x="date", y="streams_cum",
                         color_discrete_sequence=[TERRACOTTA],
-                        labels={"cumulative_streams": "Total Streams", "date": ""})
+                        labels={"streams_cum": "Total Streams", "date": ""})
         fig12.update_traces(fillcolor="rgba(193,85,58,0.15)", line=dict(width=2.5))
         fig12.update_layout(**CHART, height=280)
         fig12.update_xaxes(showgrid=False)
@@ -761,7 +1413,7 @@ with tab4:
         wrap_chart(fig12)
 
     with d2:
-        st.markdown('<div class="section-header">Follower Growth Curve</div>', unsafe_allow_html=True)
+        section("Follower Growth Curve")
         fig13 = px.line(tl.sort_values("date"), x="date", y="followers",
                         color_discrete_sequence=[LAVENDER],
                         labels={"followers": "Followers", "date": ""})
@@ -771,8 +1423,64 @@ with tab4:
         fig13.update_yaxes(showgrid=True, gridcolor=LIGHT_GRAY)
         wrap_chart(fig13)
 
-    st.markdown('<div class="section-header">🦆 Custom DuckDB SQL Console</div>', unsafe_allow_html=True)
-    st.caption("Tables: `timeline` (date, listeners, streams, followers) · `songs` (song, listeners, streams, saves, release_date)")
+    section("🧪 Badge Threshold Simulator")
+    st.caption("How often the health badges would have been Healthy, Low or Critical on each day, "
+               "graded over rolling windows and across a grid of alternative thresholds.")
+    q1, q2 = st.columns(2, gap="medium")
+    sim_kpi    = q1.selectbox("KPI", list(SIM_KPIS), key="sim_kpi")
+    sim_window = q2.selectbox("Rolling window", SIM_WINDOWS, key="sim_window",
+                              format_func=lambda d: f"{d} days")
+    bench = SIM_KPIS[sim_kpi]
+    sim_values = rolling_kpis(tl["streams_cum"].to_numpy()[None, :], tl["listeners_cum"].to_numpy()[None, :],
+                              tl["followers"].to_numpy()[None, :], SIM_WINDOWS)[sim_kpi]
+    healthy_grid = np.round(bench["healthy"] * np.linspace(0.25, 2, 15), 3)
+    low_grid     = np.round(bench["low"] * np.linspace(0.25, 2, 15), 3)
+    shares = badge_shares(sim_values, healthy_grid, low_grid)
+    k = SIM_WINDOWS.index(sim_window)
+
+    graded = grade_days(sim_values[0, k], bench["healthy"], bench["low"])
+    by_month = (pd.DataFrame({"month": tl["date"].dt.strftime("%Y-%m"), "grade": graded})
+                  .query("grade >= 0")
+                  .assign(badge=lambda d: d["grade"].map({2: "Healthy", 1: "Low", 0: "Critical"}))
+                  .groupby(["month", "badge"]).size().rename("days").reset_index())
+    fig14 = px.bar(by_month, x="month", y="days", color="badge",
+                   color_discrete_map={"Healthy": G, "Low": Y, "Critical": R},
+                   category_orders={"badge": ["Healthy", "Low", "Critical"]},
+                   labels={"days": "Days", "month": "", "badge": ""})
+    fig14.update_layout(**CHART, height=320, title=f"{ARTIST} · badge per day at current benchmarks",
+                        legend=dict(orientation="h", yanchor="bottom", y=1.02))
+    fig14.update_traces(marker_line_width=0)
+    fig14.update_xaxes(showgrid=False)
+    fig14.update_yaxes(showgrid=True, gridcolor=LIGHT_GRAY)
+    wrap_chart(fig14)
+
+    # Healthy moves only with its threshold and Critical only with Low, so all three shares are shown.
+    fig15 = make_subplots(rows=1, cols=3, shared_yaxes=True, horizontal_spacing=0.04,
+                          subplot_titles=["% of days Healthy", "% of days Low", "% of days Critical"])
+    for col, badge_name in enumerate(["Healthy", "Low", "Critical"], start=1):
+        fig15.add_trace(go.Heatmap(z=shares[badge_name][0, k] * 100, x=low_grid, y=healthy_grid, coloraxis="coloraxis",
+                                   hovertemplate=f"Healthy ≥ %{{y}}<br>Low ≥ %{{x}}<br>%{{z:.0f}}% of days {badge_name}<extra></extra>"),
+                        row=1, col=col)
+        fig15.add_trace(go.Scatter(x=[bench["low"]], y=[bench["healthy"]], mode="markers", name="Current",
+                                   marker=dict(symbol="x", size=12, color=TEXT_DARK)), row=1, col=col)
+        fig15.update_xaxes(title_text=f"Low threshold ({bench['unit']})", row=1, col=col)
+    fig15.update_layout(**CHART, height=360, showlegend=False,
+                        coloraxis=dict(colorscale=SCALE, cmin=0, cmax=100, colorbar=dict(title="% of days")))
+    fig15.update_yaxes(title_text=f"Healthy threshold ({bench['unit']})", row=1, col=1)
+    wrap_chart(fig15)
+
+    defined = graded[graded >= 0]
+    if len(defined):
+        st.markdown(insight(
+            f"At the current benchmarks ({sim_kpi} Healthy ≥ {bench['healthy']:g}{bench['unit']}, Low ≥ {bench['low']:g}{bench['unit']}) "
+            f"over {sim_window}-day windows, {ARTIST} was Healthy on {(defined == 2).mean():.0%} of days, "
+            f"Low on {(defined == 1).mean():.0%} and Critical on {(defined == 0).mean():.0%}.", "🧪"), unsafe_allow_html=True)
+
+    snapshot_url = publish_snapshot(ARTIST, data_version, write=snapshot_due)
+    st.session_state["snapshot_versions"].add(data_version)
+
+    section("🦆 Custom DuckDB SQL Console")
+    st.caption("Tables: `timeline` (date, listeners, streams, followers, streams_cum, listeners_cum) · `songs` (song, listeners, streams, saves, release_date, track_id, work_id, work) · `song_works` (work_id, song, versions, listeners, streams, saves, release_date)")
 
     default_sql = "SELECT song, streams, saves,\n       ROUND(saves * 100.0 / NULLIF(streams, 0), 2) AS save_rate_pct\nFROM songs\nORDER BY streams DESC\nLIMIT 20"
     sql_input = st.text_area("", value=default_sql, height=130, label_visibility="collapsed")
@@ -792,9 +1500,13 @@ with tab4:
         except Exception as e:
             st.error(f"Query error: {e}")
 
-    st.markdown('<div class="section-header">⬇️ Export</div>', unsafe_allow_html=True)
-    ex1, ex2, _ = st.columns([1, 1, 2])
+    section("⬇️ Export")
+    ex1, ex2, ex3, _ = st.columns([1, 1, 1, 1])
     with ex1:
-        st.download_button("⬇ Timeline CSV", tl.to_csv(index=False), "timeline.csv", "text/csv", use_container_width=True)
+        st.download_button("⬇ Timeline CSV", tl.drop(columns=["streams_cum", "listeners_cum"]).to_csv(index=False),
+                           "timeline.csv", "text/csv", use_container_width=True)
     with ex2:
-        st.download_button("⬇ Songs CSV", songs_df.to_csv(index=False), "songs.csv", "text/csv", use_container_width=True)
\ No newline at end of file
+        st.download_button("⬇ Songs CSV", songs_df.to_csv(index=False), "songs.csv", "text/csv", use_container_width=True)
+    if snapshot_url:
+        ex3.link_button("🔗 Static Snapshot", f"/{snapshot_url}", use_container_width=True,
+                       help="Read-only copy of this dashboard, regenerated only when the data changes.")